@@ -3,17 +3,19 @@
 
 import os
 import re
+import tomllib
+
+_INIT_RE = re.compile(r'__version__\s*=\s*"[^"]*"')
 
 
 def get_version():
     """Get version from pyproject.toml."""
-    # Use regex to extract version from pyproject.toml
-    with open("pyproject.toml", "r") as f:
-        content = f.read()
-        version_match = re.search(r'version\s*=\s*"([^"]+)"', content)
-        if version_match:
-            return version_match.group(1)
-        raise ValueError("Could not find version in pyproject.toml")
+    with open("pyproject.toml", "rb") as f:
+        data = tomllib.load(f)
+    try:
+        return data["project"]["version"]
+    except KeyError:
+        raise KeyError("Could not find [project] version in pyproject.toml") from None
 
 
 def update_init_version(filename, version):
@@ -26,7 +28,7 @@ def update_init_version(filename, version):
         content = file.read()
 
     # Replace version using regex
-    new_content = re.sub(r'__version__\s*=\s*"[^"]*"', f'__version__ = "{version}"', content)
+    new_content = _INIT_RE.sub(f'__version__ = "{version}"', content)
 
     if new_content == content:
         print(f"No changes needed in {filename}")
@@ -1,58 +1,222 @@
 """
 Configuration handling for Hive reward claiming scripts.
-Handles loading accounts and API keys from YAML files or environment variables.
+Handles loading accounts and API keys from YAML or JSON files or environment variables.
 """
 
+import copy
+import json
 import logging
+import mmap
 import os
-import sys
-from typing import List, Optional, Tuple
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
+from claim_rewards.exceptions import ConfigError
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
 logger = logging.getLogger(__name__)
 
+# Parsed config documents keyed by absolute path, validated against ((mtime_ns, size), document)
+_CONFIG_CACHE: "OrderedDict[str, Tuple[Tuple[int, int], Dict[str, Any]]]" = OrderedDict()
+_CONFIG_CACHE_MAX = 100
+
+# Config files looked up in the current directory when no path is given, in order
+DEFAULT_CONFIG_FILES = ("accounts.yaml", "accounts.json")
+
+# Suffix of the JSON copy written next to a parsed YAML file
+_JSON_SIDECAR_SUFFIX = ".json"
+
+# Only files with these suffixes get a sidecar, so "<name>.json" can never be a user's own file
+_YAML_SUFFIXES = (".yaml", ".yml")
+
+
+def _read_json_sidecar(path: str, source_key: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+    """
+    Read the JSON sidecar for a YAML file if it was written for the current source.
+
+    Args:
+        path: Absolute path to the YAML file.
+        source_key: (mtime_ns, size) of the YAML file.
+
+    Returns:
+        The cached document, or None if the sidecar is missing, stale or unreadable.
+    """
+    sidecar = path + _JSON_SIDECAR_SUFFIX
+    try:
+        with open(sidecar, "r") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("source") != list(source_key):
+        return None
+    data = entry.get("data")
+    if not isinstance(data, dict):
+        return None
+    logger.debug("Loaded JSON sidecar %s", sidecar)
+    return data
+
+
+def _write_json_sidecar(path: str, source_key: Tuple[int, int], data: Dict[str, Any]) -> None:
+    """
+    Atomically write the parsed YAML document next to its source as JSON.
+
+    The source's (mtime_ns, size) is stored with the document, so any change
+    to the YAML file invalidates the sidecar. The sidecar may contain the
+    posting key, so it is created with owner-only permissions. Failures
+    (read-only directories, unserializable values) are ignored and the YAML
+    is simply parsed again next time.
+
+    Args:
+        path: Absolute path to the YAML file.
+        source_key: (mtime_ns, size) of the YAML file.
+        data: Parsed YAML document.
+    """
+    sidecar = path + _JSON_SIDECAR_SUFFIX
+    tmp = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"source": list(source_key), "data": data}, f)
+        os.replace(tmp, sidecar)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug("Could not write JSON sidecar %s: %s", sidecar, e)
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _parse_yaml_file(path: str) -> Any:
+    """
+    Parse a YAML file, prefaulting it into memory where the platform allows.
+
+    On Linux the file is mapped with MAP_POPULATE so the parser never stalls on
+    page faults. Elsewhere, and for empty files (which cannot be mapped), it is
+    read in one go as bytes, leaving decoding to the parser.
+
+    Args:
+        path: Path to the YAML file.
+
+    Returns:
+        The parsed YAML document.
+    """
+    populate = getattr(mmap, "MAP_POPULATE", 0)
+    if populate:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            try:
+                mm = mmap.mmap(fd, 0, flags=mmap.MAP_PRIVATE | populate, prot=mmap.PROT_READ)
+            except ValueError:  # empty file
+                mm = None
+            if mm is not None:
+                with mm:
+                    return yaml.load(mm, Loader=_SafeLoader)
+        finally:
+            os.close(fd)
+
+    return yaml.load(Path(path).read_bytes(), Loader=_SafeLoader)
+
+
+def _load_config_cached(path: str) -> Dict[str, Any]:
+    """
+    Load a YAML or JSON config file, reusing a previously parsed copy if the file is unchanged.
+
+    A cache hit costs a single stat call; the file itself is never opened.
+    Files ending in .json are parsed with the json module, anything else as YAML.
+    Only .yaml and .yml files get a JSON sidecar.
+
+    Args:
+        path: Path to the config file.
+
+    Returns:
+        A deep copy of the parsed document (empty dict for an empty file).
+
+    Raises:
+        ConfigError: If the document is not a mapping.
+    """
+    abs_path = os.path.abspath(path)
+    st = os.stat(abs_path)
+    key = (st.st_mtime_ns, st.st_size)
+    entry = _CONFIG_CACHE.get(abs_path)
+    if entry is not None and entry[0] == key:
+        _CONFIG_CACHE.move_to_end(abs_path)
+        logger.debug("Using cached config for %s", abs_path)
+        return copy.deepcopy(entry[1])
+
+    if abs_path.endswith(".json"):
+        # JSON needs no sidecar, it is already the fast format
+        raw = Path(abs_path).read_bytes()
+        data = (json.loads(raw) if raw.strip() else None) or {}
+    elif not abs_path.endswith(_YAML_SUFFIXES):
+        data = _parse_yaml_file(abs_path) or {}
+    else:
+        data = _read_json_sidecar(abs_path, key)
+        if data is None:
+            data = _parse_yaml_file(abs_path) or {}
+            # Documents that are not a mapping are rejected below, keep no copy of them
+            if isinstance(data, dict):
+                _write_json_sidecar(abs_path, key, data)
+
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path} must contain a mapping, not a {type(data).__name__}")
+
+    _CONFIG_CACHE[abs_path] = (key, data)
+    _CONFIG_CACHE.move_to_end(abs_path)
+    if len(_CONFIG_CACHE) > _CONFIG_CACHE_MAX:
+        _CONFIG_CACHE.popitem(last=False)
+    return copy.deepcopy(data)
+
 
 def load_accounts_and_posting_key(
     accounts_path: Optional[str] = None,
 ) -> Tuple[List[str], Optional[str]]:
     """
-    Load accounts list and posting key from YAML file.
+    Load accounts list and posting key from a YAML or JSON config file.
 
     Args:
-        accounts_path: Path to YAML config file. If None, tries accounts.yaml in current directory.
+        accounts_path: Path to the config file. If None, tries accounts.yaml and then
+            accounts.json in the current directory.
 
     Returns:
         Tuple of (list of account names, posting key)
 
     Raises:
-        SystemExit: If no account list is found or there's an error loading the file.
+        ConfigError: If no account list is found or there's an error loading the file.
     """
     if accounts_path:
         try:
-            with open(accounts_path, "r") as f:
-                data = yaml.safe_load(f)
-            logger.info(f"Loaded accounts and posting key from {accounts_path}")
-            return data.get("accounts", []), data.get("posting_key")
+            data = _load_config_cached(accounts_path)
+        except ConfigError:
+            raise
         except Exception as e:
-            logger.error(f"Failed to load accounts from {accounts_path}: {e}")
-            sys.exit(1)
+            raise ConfigError(f"Failed to load accounts from {accounts_path}: {e}") from e
+        logger.info(f"Loaded accounts and posting key from {accounts_path}")
+        return data.get("accounts", []), data.get("posting_key")
 
-    # Try default accounts.yaml
-    if os.path.exists("accounts.yaml"):
+    # Try the default config files (missing ones fall through to the error below)
+    for default_path in DEFAULT_CONFIG_FILES:
         try:
-            with open("accounts.yaml", "r") as f:
-                data = yaml.safe_load(f)
-            logger.info("Loaded accounts and posting key from accounts.yaml")
-            return data.get("accounts", []), data.get("posting_key")
+            data = _load_config_cached(default_path)
+        except FileNotFoundError:
+            continue
+        except ConfigError:
+            raise
         except Exception as e:
-            logger.error(f"Failed to load accounts from accounts.yaml: {e}")
-            sys.exit(1)
+            raise ConfigError(f"Failed to load accounts from {default_path}: {e}") from e
+        logger.info(f"Loaded accounts and posting key from {default_path}")
+        return data.get("accounts", []), data.get("posting_key")
 
-    logger.error(
-        "No account list found. Please provide --accounts or create accounts.yaml in the current directory."
+    raise ConfigError(
+        "No account list found. Please provide --accounts or create accounts.yaml "
+        "(or accounts.json) in the current directory."
     )
-    sys.exit(1)
 
 
 def get_posting_key(
@@ -69,29 +233,27 @@ def get_posting_key(
         The posting key.
 
     Raises:
-        SystemExit: If no posting key is found.
+        ConfigError: If no posting key is found.
     """
     logger.debug(
-        f"Attempting to retrieve posting key (cli_posting_key provided: {bool(cli_posting_key)}, "
-        f"yaml_posting_key provided: {bool(yaml_posting_key)})"
+        "Attempting to retrieve posting key (cli_posting_key provided: %s, "
+        "yaml_posting_key provided: %s)",
+        bool(cli_posting_key),
+        bool(yaml_posting_key),
     )
 
     if cli_posting_key:
         logger.info("Using posting key from --posting_key argument.")
-        posting_key = cli_posting_key
-    elif yaml_posting_key:
+        return cli_posting_key
+    if yaml_posting_key:
         logger.info("Using posting key from YAML config file.")
-        posting_key = yaml_posting_key
-    else:
-        posting_key = os.getenv("POSTING_KEY")
-        if posting_key:
-            logger.info("Using posting key from POSTING_KEY environment variable.")
+        return yaml_posting_key
 
+    posting_key = os.getenv("POSTING_KEY")
     if not posting_key:
-        logger.error(
+        raise ConfigError(
             "Posting key must be provided via --posting_key, YAML config, or POSTING_KEY env variable."
         )
-        sys.exit(1)
 
-    logger.debug("Posting key successfully retrieved.")
+    logger.info("Using posting key from POSTING_KEY environment variable.")
     return posting_key
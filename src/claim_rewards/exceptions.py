@@ -0,0 +1,16 @@
+"""
+Exception types raised by the claim_rewards package.
+Library functions raise these instead of exiting, the CLI turns them into an exit status.
+"""
+
+
+class ClaimError(Exception):
+    """Base class for all claim_rewards errors."""
+
+
+class ConfigError(ClaimError):
+    """The accounts list or posting key could not be loaded."""
+
+
+class ConnectError(ClaimError):
+    """No connection to the Hive blockchain could be made."""
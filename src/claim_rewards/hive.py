@@ -13,101 +13,413 @@ Author: thecrazygm
 """
 
 import argparse
+import logging
 import sys
-import traceback
-from typing import List
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from claim_rewards.config import get_posting_key, load_accounts_and_posting_key
-from claim_rewards.hive_client import connect_to_hive
+from claim_rewards.exceptions import ClaimError, ConfigError
+from claim_rewards.hive_client import (
+    NODE_CACHE_TTL,
+    NODE_ERRORS,
+    close_hive,
+    connect_to_hive,
+    invalidate_node_cache,
+    with_retry,
+)
 from claim_rewards.logging_setup import set_debug_logging, setup_logging
 
+# nectar takes a large share of startup time, so it is only imported once a
+# connection is needed and --help or configuration errors return quickly
+if TYPE_CHECKING:
+    from nectar.account import Account
+    from nectar.amount import Amount
+    from nectar.hive import Hive
+    from nectarbase import operations
+
 # Set up logging
 logger = setup_logging()
 
 
+# Default number of account fetches run concurrently
+DEFAULT_CONCURRENCY = 8
+
+# Number of accounts requested per find_accounts RPC call
+ACCOUNT_BATCH_SIZE = 100
+
+# Maximum number of claim operations bundled into one transaction
+CLAIM_BATCH_SIZE = 50
+
+# Account fields holding claimable reward balances, in claim_reward_balance order
+REWARD_FIELDS = ("reward_hive_balance", "reward_hbd_balance", "reward_vesting_balance")
+
+# Raw asset amounts meaning "nothing to claim" (nodes send canonical integer strings)
+_ZERO_AMOUNTS = ("0", 0)
+
+
+def _has_rewards(account: Dict[str, Any]) -> bool:
+    """
+    Return True if any reward balance in the raw account data is nonzero.
+
+    Args:
+        account: Raw account data from the find_accounts RPC.
+    """
+    hive_reward = account.get("reward_hive_balance")
+    hbd_reward = account.get("reward_hbd_balance")
+    vests_reward = account.get("reward_vesting_balance")
+    return bool(
+        (hive_reward is not None and hive_reward["amount"] not in _ZERO_AMOUNTS)
+        or (hbd_reward is not None and hbd_reward["amount"] not in _ZERO_AMOUNTS)
+        or (vests_reward is not None and vests_reward["amount"] not in _ZERO_AMOUNTS)
+    )
+
+
+def _pending_rewards(account: Dict[str, Any], hive: "Hive") -> List["Amount"]:
+    """
+    Return the nonzero reward balances of an account.
+
+    Only the nonzero raw balances are parsed into Amount objects; no Account
+    object is built for the target account.
+
+    Args:
+        account: Raw account data from the find_accounts RPC.
+        hive: The connected Hive instance.
+
+    Returns:
+        The Amount objects for each reward balance greater than zero.
+    """
+    from nectar.amount import Amount
+
+    return [
+        Amount(account[field], blockchain_instance=hive)
+        for field in REWARD_FIELDS
+        if field in account and account[field]["amount"] not in _ZERO_AMOUNTS
+    ]
+
+
+def _fetch_account_batch(names: List[str], hive: "Hive") -> Optional[List[Dict[str, Any]]]:
+    """
+    Fetch one batch of accounts with a single find_accounts RPC call.
+
+    Args:
+        names: Account names to fetch (at most ACCOUNT_BATCH_SIZE).
+        hive: The connected Hive instance.
+
+    Returns:
+        The raw account dicts. An empty list if the request itself was rejected
+        (the accounts are then fetched one by one), None if the nodes failed.
+    """
+    try:
+        result = with_retry(partial(hive.rpc.find_accounts, {"accounts": names}), hive=hive)
+        return result["accounts"]
+    except NODE_ERRORS as e:
+        logger.warning(f"Bulk account fetch failed for {len(names)} accounts: {e}")
+        logger.debug("Traceback:", exc_info=True)
+        # Nodes that keep failing should not be reused from the cache on the next run
+        invalidate_node_cache()
+        return None
+    except Exception as e:
+        # A deterministic error (e.g. an invalid account name) says nothing about the nodes
+        logger.warning(
+            f"Bulk account fetch rejected for {len(names)} accounts "
+            f"({type(e).__name__}: {e}), fetching them individually"
+        )
+        logger.debug("Traceback:", exc_info=True)
+        return []
+
+
+def _fetch_accounts(
+    accounts: List[str], hive: "Hive", executor: ThreadPoolExecutor
+) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+    """
+    Fetch all accounts in batches instead of one RPC call per account.
+
+    Batches are requested concurrently on the given executor. Accounts missing
+    from the result are left out and get fetched individually later.
+
+    Args:
+        accounts: Account names to fetch.
+        hive: The connected Hive instance.
+        executor: Thread pool used to run the batch requests.
+
+    Returns:
+        Tuple of (dict mapping account name to its raw account data, whether any batch failed)
+    """
+    batches = [
+        accounts[i : i + ACCOUNT_BATCH_SIZE] for i in range(0, len(accounts), ACCOUNT_BATCH_SIZE)
+    ]
+    fetched = {}
+    failed = False
+    for batch in executor.map(partial(_fetch_account_batch, hive=hive), batches):
+        if batch is None:
+            failed = True
+            continue
+        for account in batch:
+            fetched[account["name"]] = account
+    logger.debug(
+        "Fetched %d of %d accounts in %d batch(es)", len(fetched), len(accounts), len(batches)
+    )
+    return fetched, failed
+
+
+def _reconnect(hive: "Hive", posting_key: str) -> "Hive":
+    """
+    Replace a connection whose nodes keep failing with one on a fresh node list.
+
+    Args:
+        hive: The current Hive instance, kept if reconnecting fails.
+        posting_key: The posting key for the main account.
+
+    Returns:
+        The new Hive instance, or the current one if no new connection could be made.
+    """
+    logger.info("Reconnecting to Hive with a fresh node list...")
+    close_hive(posting_key)
+    try:
+        return connect_to_hive(posting_key)
+    except Exception as e:
+        logger.warning(f"Reconnecting to Hive failed, keeping the current connection: {e}")
+        return hive
+
+
+def _fetch_account(account_name: str, hive: "Hive") -> Optional[Dict[str, Any]]:
+    """
+    Fetch a single account that the bulk fetch did not return.
+
+    Args:
+        account_name: The account to fetch.
+        hive: The connected Hive instance.
+
+    Returns:
+        The raw account data, or None if it could not be loaded (the error is logged).
+    """
+    try:
+        result = with_retry(
+            partial(hive.rpc.find_accounts, {"accounts": [account_name]}), hive=hive
+        )
+        found = result["accounts"]
+    except Exception as e:
+        logger.error(f"Error processing account {account_name}: {type(e).__name__}: {e}")
+        logger.debug("Traceback:", exc_info=True)
+        return None
+    if not found:
+        logger.error(f"Error processing account {account_name}: account does not exist")
+        return None
+    logger.debug("[%s] Target account fetched.", account_name)
+    return found[0]
+
+
+def _claim_op(account: Dict[str, Any], hive: "Hive") -> "operations.Claim_reward_balance":
+    """
+    Build the claim_reward_balance operation for all pending rewards of an account.
+
+    Args:
+        account: Raw account data of the account to claim for.
+        hive: The connected Hive instance.
+
+    Returns:
+        The claim operation, ready to be appended to a transaction.
+    """
+    from nectarbase import operations
+
+    return operations.Claim_reward_balance(
+        **{
+            "account": account["name"],
+            "reward_hive": account["reward_hive_balance"],
+            "reward_hbd": account["reward_hbd_balance"],
+            "reward_vests": account["reward_vesting_balance"],
+            "prefix": hive.prefix,
+            "json_str": True,
+        }
+    )
+
+
+def _claim_account(
+    target_account: Dict[str, Any], main_account: "Account", main_account_name: str
+) -> bool:
+    """
+    Claim the rewards of a single account in its own transaction.
+
+    Args:
+        target_account: Raw account data of the account to claim for.
+        main_account: The nectar Account whose authority is used for claiming.
+        main_account_name: Name of the main account, for logging.
+
+    Returns:
+        True if the claim was broadcast, False otherwise.
+    """
+    account_name = target_account["name"]
+    try:
+        logger.debug("Calling main_account.claim_reward_balance(account=%s)...", account_name)
+        # Pass the fetched data itself so nectar does not fetch the account again
+        main_account.claim_reward_balance(account=target_account)
+        logger.info(
+            f"[{account_name}] Rewards claimed successfully using authority of {main_account_name}."
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Error processing account {account_name}: {type(e).__name__}: {e}")
+        logger.debug("Traceback:", exc_info=True)
+        logger.debug("%s account json: %s", account_name, target_account)
+        return False
+
+
+def _broadcast_claims(
+    batch: List[Dict[str, Any]], hive: "Hive", main_account: "Account", main_account_name: str
+) -> int:
+    """
+    Claim the rewards of several accounts with one signed transaction.
+
+    If the batched transaction fails, every account in the batch is retried in
+    its own transaction so one bad claim does not block the others.
+
+    Args:
+        batch: Raw account data of the accounts to claim for (at most CLAIM_BATCH_SIZE).
+        hive: The connected Hive instance.
+        main_account: The nectar Account whose authority is used for claiming.
+        main_account_name: Name of the main account, for logging.
+
+    Returns:
+        The number of accounts whose rewards were claimed.
+    """
+    names = [account["name"] for account in batch]
+    try:
+        logger.debug("Broadcasting one transaction with claims for: %s", names)
+        from nectar.transactionbuilder import TransactionBuilder
+
+        tx = TransactionBuilder(blockchain_instance=hive)
+        for account in batch:
+            tx.appendOps(_claim_op(account, hive))
+        # Every claim is authorized by the main account's posting key
+        tx.appendSigner(main_account, "posting")
+        tx.sign()
+        tx.broadcast()
+    except Exception as e:
+        logger.warning(
+            f"Batched claim for {len(batch)} accounts failed ({type(e).__name__}: {e}), "
+            "retrying each account individually"
+        )
+        logger.debug("Traceback:", exc_info=True)
+        return sum(_claim_account(account, main_account, main_account_name) for account in batch)
+
+    for name in names:
+        logger.info(
+            f"[{name}] Rewards claimed successfully using authority of {main_account_name}."
+        )
+    return len(batch)
+
+
 def claim_rewards_for_all_accounts(
-    accounts: List[str], main_account_name: str, posting_key: str, dry_run: bool = False
+    accounts: List[str],
+    main_account_name: str,
+    posting_key: str,
+    dry_run: bool = False,
+    hive: Optional["Hive"] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
 ) -> None:
     """
     Claim rewards for all accounts in the list using the authority of the main account.
 
+    Raw account data is fetched in batches of ACCOUNT_BATCH_SIZE (concurrently)
+    and accounts without pending rewards are dropped up front. The remaining
+    claims are built from the raw data (only the main account becomes an
+    Account) and broadcast as transactions of up to CLAIM_BATCH_SIZE operations.
+
     Args:
         accounts: List of account names to claim rewards for.
         main_account_name: The account whose posting key is used for authority.
         posting_key: The posting key for the main account.
         dry_run: If True, only simulate the claim, do not broadcast.
+        hive: An already connected Hive instance. If None, a new connection is made.
+        concurrency: Maximum number of concurrent account fetches.
     """
     logger.info(
         f"Claiming rewards for {len(accounts)} accounts using {main_account_name} authority"
     )
 
     # Connect to Hive blockchain
-    try:
-        hive = connect_to_hive(posting_key)
-    except Exception as e:
-        logger.error(f"Failed to connect to Hive blockchain: {e}")
-        return
+    if hive is None:
+        try:
+            hive = connect_to_hive(posting_key)
+        except Exception as e:
+            logger.error(f"Failed to connect to Hive blockchain: {e}")
+            return
 
-    # Instantiate the main account for authority
-    logger.debug(f"Instantiating main account object for authority: {main_account_name}")
-    try:
-        from nectar.account import Account
+    logger.debug("Account list to process: %s", accounts)
 
-        main_account = Account(main_account_name, blockchain_instance=hive)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        # Fetch the accounts in bulk
+        prefetched, batch_failed = _fetch_accounts(accounts, hive, executor)
+
+        # Only accounts with pending rewards (or missing from the bulk result) go on
+        claimable = []
+        skipped = []
+        for name in accounts:
+            account = prefetched.get(name)
+            if account is not None and not _has_rewards(account):
+                skipped.append(name)
+                continue
+            claimable.append(name)
+        logger.debug("Accounts with rewards to claim: %s", claimable)
+
+        # Fetch any accounts the bulk request did not return one by one
+        missing = [name for name in claimable if name not in prefetched]
+        if missing and batch_failed:
+            # The batches already used up their retries on the current nodes
+            hive = _reconnect(hive, posting_key)
+        fetched = dict(zip(missing, executor.map(partial(_fetch_account, hive=hive), missing)))
+
+    from nectar.account import Account
+
+    # Instantiate the main account for authority, reusing its data if it was already fetched
+    logger.debug("Instantiating main account object for authority: %s", main_account_name)
+    main_data = prefetched.get(main_account_name) or fetched.get(main_account_name)
+    try:
+        # Account() parses the balances of a dict in place, so hand it a copy
+        main_account = Account(
+            dict(main_data) if main_data else main_account_name, blockchain_instance=hive
+        )
     except Exception as e:
         logger.error(f"Error loading main account {main_account_name}: {e}")
         return
 
-    logger.debug(f"Account list to process: {accounts}")
-
-    # Process each account in the list
-    success_count = 0
-    for account_name in accounts:
-        try:
-            logger.debug(f"Processing account: {account_name}")
-            # Instantiate the target account object
-            target_account = Account(account_name, blockchain_instance=hive)
-            logger.debug(f"[{account_name}] Target account instantiated.")
-
-            # Get the reward balances using the nectar property
-            rewards = getattr(target_account, "reward_balances", [])
-            logger.debug(f"[{account_name}] reward_balances property: {rewards}")
-
-            # If there are no rewards, skip
-            if not rewards or all(getattr(r, "amount", 0) == 0 for r in rewards):
-                logger.info(f"[{account_name}] No rewards to claim.")
-                continue
+    to_claim = []
+    for name in claimable:
+        account = prefetched.get(name) or fetched.get(name)
+        if account is None:
+            continue
+        if not _has_rewards(account):
+            skipped.append(name)
+            continue
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[%s] Rewards to claim: %s", name, _pending_rewards(account, hive))
+        to_claim.append(account)
 
-            logger.info(f"[{account_name}] Rewards to claim: {rewards}")
-
-            if dry_run:
-                logger.info(
-                    f"[DRY RUN] Would claim rewards for {account_name} using authority of {main_account_name}."
-                )
-                logger.debug(
-                    f"[DRY RUN] main_account.claim_reward_balance(account={account_name}) would be called here."
-                )
-                success_count += 1
-            else:
-                logger.debug(
-                    f"Calling main_account.claim_reward_balance(account={account_name})..."
-                )
-                main_account.claim_reward_balance(account=account_name)
-                logger.info(
-                    f"[{account_name}] Rewards claimed successfully using authority of {main_account_name}."
-                )
-                success_count += 1
+    # One summary line instead of one line per idle account
+    if skipped:
+        logger.info(f"No rewards to claim for {len(skipped)} account(s).")
+        logger.debug("Accounts without rewards: %s", skipped)
 
-        except Exception as e:
-            logger.error(f"Error processing account {account_name}: {type(e).__name__}: {e}")
-            logger.debug(traceback.format_exc())
-            # Try to print account JSON for debugging if possible
-            try:
-                logger.debug(
-                    f"{account_name} account json: {getattr(target_account, 'json', None)}"
-                )
-            except Exception:
-                logger.debug(f"Could not retrieve account JSON for {account_name}")
+    if dry_run:
+        for account in to_claim:
+            logger.info(
+                f"[DRY RUN] Would claim rewards for {account['name']} using authority of {main_account_name}."
+            )
+        logger.debug(
+            "[DRY RUN] %d claim operation(s) in batches of %d would be broadcast here.",
+            len(to_claim),
+            CLAIM_BATCH_SIZE,
+        )
+        success_count = len(to_claim)
+    else:
+        success_count = 0
+        for i in range(0, len(to_claim), CLAIM_BATCH_SIZE):
+            success_count += _broadcast_claims(
+                to_claim[i : i + CLAIM_BATCH_SIZE], hive, main_account, main_account_name
+            )
 
     logger.info(f"Successfully processed {success_count} out of {len(accounts)} accounts")
 
@@ -124,7 +436,7 @@ def main() -> None:
     parser.add_argument(
         "-a",
         "--accounts",
-        help="Path to YAML file containing accounts list and optional posting key",
+        help="Path to YAML or JSON file containing accounts list and optional posting key",
     )
     parser.add_argument(
         "-k",
@@ -142,29 +454,124 @@ def main() -> None:
         action="store_true",
         help="Simulate claiming rewards without broadcasting",
     )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Number of account fetches to run concurrently (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--refresh-nodes",
+        action="store_true",
+        help="Ignore the cached Hive node list and fetch a fresh one",
+    )
+    parser.add_argument(
+        "--node-cache-ttl",
+        type=int,
+        metavar="SECONDS",
+        default=NODE_CACHE_TTL,
+        help=f"Seconds to reuse the cached Hive node list (default: {NODE_CACHE_TTL})",
+    )
     args = parser.parse_args()
 
     # Set logging level if debug flag is used
     if args.debug:
         set_debug_logging(logger)
 
-    # Load accounts list and posting key from YAML file or fallback
+    try:
+        _run(args)
+    except ClaimError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+
+def _connect_in_background(posting_key: str, **kwargs: Any) -> "Future[Hive]":
+    """
+    Start connect_to_hive on a daemon thread.
+
+    Unlike an executor worker, the thread is not joined at interpreter exit, so
+    a config error can end the process without waiting for the connection.
+
+    Args:
+        posting_key: The posting private key.
+        **kwargs: Further arguments for connect_to_hive.
+
+    Returns:
+        A future that receives the connected Hive instance or the connection error.
+    """
+    future: "Future[Hive]" = Future()
+
+    def connect() -> None:
+        try:
+            future.set_result(connect_to_hive(posting_key, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=connect, name="hive-connect", daemon=True).start()
+    return future
+
+
+def _run(args: argparse.Namespace) -> None:
+    """
+    Load the configuration, connect to Hive and claim rewards as requested by the CLI arguments.
+
+    Args:
+        args: Parsed command-line arguments.
+
+    Raises:
+        ClaimError: If the configuration cannot be loaded or Hive cannot be reached.
+    """
+    # Load accounts list and posting key from YAML file or fallback. When the posting
+    # key is given on the command line, connect to Hive at the same time so the
+    # config load overlaps the node connection instead of preceding it.
+    hive_future = (
+        _connect_in_background(
+            args.posting_key,
+            refresh_nodes=args.refresh_nodes,
+            node_cache_ttl=args.node_cache_ttl,
+        )
+        if args.posting_key
+        else None
+    )
     accounts, yaml_posting_key = load_accounts_and_posting_key(args.accounts)
 
     # Ensure we have at least one account
     if not accounts:
-        logger.error("No accounts found in configuration")
-        sys.exit(1)
+        raise ConfigError("No accounts found in configuration")
+
+    # Drop duplicate accounts (keeping the first occurrence) so each is claimed once
+    unique_accounts = list(dict.fromkeys(accounts))
+    if len(unique_accounts) != len(accounts):
+        logger.warning(
+            f"Ignoring {len(accounts) - len(unique_accounts)} duplicate account(s) in configuration"
+        )
+        accounts = unique_accounts
 
     # Retrieve the posting key from CLI, YAML, or environment
     posting_key = get_posting_key(args.posting_key, yaml_posting_key)
 
     # Use the first account in the list as the authority
     main_account_name = accounts[0]
-    logger.debug(f"Using main authority account: {main_account_name}")
+    logger.debug("Using main authority account: %s", main_account_name)
+
+    # Join the early connection, or connect now that the posting key is known
+    if hive_future is not None:
+        hive = hive_future.result()
+    else:
+        hive = connect_to_hive(
+            posting_key, refresh_nodes=args.refresh_nodes, node_cache_ttl=args.node_cache_ttl
+        )
 
     # Claim rewards for all listed accounts
-    claim_rewards_for_all_accounts(accounts, main_account_name, posting_key, dry_run=args.dry_run)
+    claim_rewards_for_all_accounts(
+        accounts,
+        main_account_name,
+        posting_key,
+        dry_run=args.dry_run,
+        hive=hive,
+        concurrency=args.concurrency,
+    )
 
 
 if __name__ == "__main__":
@@ -3,33 +3,292 @@ Hive blockchain connectivity module.
 Provides functions for connecting to the Hive blockchain and performing common operations.
 """
 
+import hashlib
+import json
 import logging
+import os
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, TypeVar
 
-from nectar.hive import Hive
+from nectarapi.exceptions import (
+    NumRetriesReached,
+    RPCConnection,
+    RPCErrorDoRetry,
+    TimeoutException,
+    WorkingNodeMissing,
+)
+
+from claim_rewards.exceptions import ConnectError
+
+# nectar is imported where it is used so that loading this module stays cheap
+if TYPE_CHECKING:
+    from nectar.hive import Hive
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Connected Hive instances keyed by a digest of the posting key and node list they were built with
+_HIVE_INSTANCES: Dict[str, "Hive"] = {}
+_HIVE_LOCK = threading.Lock()
+
+# How long the on-disk list of discovered Hive nodes is reused, in seconds
+NODE_CACHE_TTL = 6 * 60 * 60
+
+# Attempts and base delay (in seconds) for retrying transient RPC failures
+RETRY_TRIES = 4
+RETRY_BASE_DELAY = 0.25
+
+# Errors that may go away on another attempt; anything else (bad parameters,
+# a rejected transaction) would only fail the same way again
+TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    RPCConnection,
+    RPCErrorDoRetry,
+    TimeoutException,
+)
+
+# Errors meaning the nodes themselves are failing. nectar raises the extra two
+# only after its own retries and node rotation gave up, so with_retry does not
+# repeat that whole budget again
+NODE_ERRORS = TRANSIENT_ERRORS + (NumRetriesReached, WorkingNodeMissing)
+
+
+def with_retry(
+    fn: Callable[[], T],
+    *,
+    tries: int = RETRY_TRIES,
+    base: float = RETRY_BASE_DELAY,
+    hive: Optional["Hive"] = None,
+) -> T:
+    """
+    Call fn, retrying with exponential backoff when it fails transiently.
+
+    Between attempts it sleeps base * 2**attempt seconds plus a little jitter.
+    If every attempt fails and a Hive instance is given, that instance is
+    switched to its next node and fn gets one last try.
+
+    Args:
+        fn: The call to make, taking no arguments.
+        tries: Number of attempts before giving up (or switching nodes).
+        base: Delay before the first retry, in seconds.
+        hive: Hive instance whose node is rotated when all attempts fail.
+
+    Returns:
+        Whatever fn returns.
+
+    Raises:
+        Exception: The first non-transient error, or the last error raised by fn.
+    """
+    for attempt in range(tries):
+        try:
+            return fn()
+        except TRANSIENT_ERRORS as e:
+            if attempt == tries - 1:
+                if hive is None:
+                    raise
+                logger.debug("Giving up after %d attempts (%s), switching node", tries, e)
+                break
+            delay = base * 2**attempt + random.random() * 0.1
+            logger.debug(
+                "Attempt %d of %d failed (%s), retrying in %.2fs", attempt + 1, tries, e, delay
+            )
+            time.sleep(delay)
+
+    hive.rpc.next()
+    return fn()
+
+
+def _key_digest(posting_key: str, nodes: Optional[List[str]] = None) -> str:
+    """Return a digest of the posting key (and nodes) so the raw key is never used as a dict key."""
+    material = posting_key + "|" + ",".join(nodes or [])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _node_cache_path() -> str:
+    """Return the path of the on-disk node cache, honouring XDG_CACHE_HOME."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "claim_rewards", "nodes.json")
+
+
+def _read_node_cache(path: str, ttl: float) -> Optional[List[str]]:
+    """
+    Read the cached node list if it is younger than the TTL.
+
+    Args:
+        path: Path to the node cache file.
+        ttl: Maximum age of the cache in seconds.
+
+    Returns:
+        The cached node URLs, or None if the cache is missing, stale or unreadable.
+    """
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        if time.time() - data["ts"] < ttl and data["nodes"]:
+            return list(data["nodes"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write_node_cache(path: str, nodes: List[str]) -> None:
+    """
+    Atomically write the node list and current timestamp to the cache file.
+
+    Args:
+        path: Path to the node cache file.
+        nodes: Node URLs to store.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump({"ts": time.time(), "nodes": nodes}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug("Could not write node cache %s: %s", path, e)
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def invalidate_node_cache() -> None:
+    """Delete the on-disk node cache so the next get_hive_nodes call fetches a fresh list."""
+    path = _node_cache_path()
+    try:
+        os.unlink(path)
+        logger.debug("Removed node cache %s", path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.debug("Could not remove node cache %s: %s", path, e)
+
+
+def get_hive_nodes(ttl: float = NODE_CACHE_TTL, refresh: bool = False) -> List[str]:
+    """
+    Return Hive node URLs, reusing the on-disk cache while it is fresh.
+
+    On a cache miss (or when a refresh is forced) the node list is fetched
+    through nectar's NodeList and written back to the cache for the next run.
+
+    Args:
+        ttl: Maximum age of the cached node list in seconds.
+        refresh: If True, ignore the cache and fetch a fresh node list.
+
+    Returns:
+        A list of Hive node URLs ordered by score.
+    """
+    from nectar.nodelist import NodeList, clear_beacon_cache
 
-def connect_to_hive(posting_key: str) -> Hive:
+    path = _node_cache_path()
+    if refresh:
+        logger.debug("Refreshing node list, ignoring cache at %s", path)
+        # NodeList() fetches from the beacon API itself, once nectar's cache is gone
+        clear_beacon_cache()
+    else:
+        nodes = _read_node_cache(path, ttl)
+        if nodes:
+            logger.debug("Using %d cached Hive nodes from %s", len(nodes), path)
+            return nodes
+        logger.debug("Node cache missing or stale, fetching node list...")
+
+    # NodeList does not raise when the beacon API is unreachable, it falls
+    # back to its static node list, so there is nothing here to retry
+    nodes = NodeList().get_hive_nodes()
+    if nodes:
+        _write_node_cache(path, nodes)
+    return nodes
+
+
+def _new_hive(posting_key: str, nodes: Optional[List[str]]) -> "Hive":
+    """Create a Hive instance for the key, on the given nodes if there are any."""
+    from nectar.hive import Hive
+
+    if nodes:
+        logger.debug("Using Hive nodes: %s", nodes)
+        return Hive(keys=[posting_key], node=nodes)
+    # Let Hive handle node initialization internally to avoid duplicate beacon calls
+    return Hive(keys=[posting_key])
+
+
+def connect_to_hive(
+    posting_key: str,
+    nodes: Optional[List[str]] = None,
+    refresh_nodes: bool = False,
+    node_cache_ttl: float = NODE_CACHE_TTL,
+) -> "Hive":
     """
     Establish a connection to the Hive blockchain using the provided posting key.
-    Automatically selects the best available Hive nodes.
+    Unless nodes are given, uses the node list cached on disk by get_hive_nodes,
+    falling back to nectar's own node selection if that fails. If connecting with
+    the cached nodes fails, the cache is dropped and one fresh list is tried.
+
+    The connection is cached per posting key and node list, so repeated calls in
+    the same process reuse the existing instance instead of reconnecting.
 
     Args:
         posting_key: The posting private key.
+        nodes: Optional list of node URLs to connect to.
+        refresh_nodes: If True, refresh the cached node list before connecting.
+        node_cache_ttl: Maximum age of the cached node list in seconds.
 
     Returns:
         A connected Hive blockchain instance.
 
     Raises:
-        SystemExit: If connection fails.
+        ConnectError: If connection fails.
     """
-    try:
-        logger.info("Connecting to Hive blockchain...")
-        # Let Hive handle node initialization internally to avoid duplicate beacon calls
-        hive = Hive(keys=[posting_key])
-        logger.info("Connected to Hive blockchain.")
+    digest = _key_digest(posting_key, nodes)
+    with _HIVE_LOCK:
+        hive = _HIVE_INSTANCES.get(digest)
+        if hive is not None:
+            logger.debug("Reusing existing Hive connection.")
+            return hive
+
+        use_nodes = nodes
+        if not use_nodes:
+            try:
+                use_nodes = get_hive_nodes(ttl=node_cache_ttl, refresh=refresh_nodes)
+            except Exception as e:
+                logger.debug("Could not load Hive node list: %s", e)
+
+        try:
+            logger.info("Connecting to Hive blockchain...")
+            try:
+                hive = _new_hive(posting_key, use_nodes)
+            except Exception as e:
+                if nodes or refresh_nodes or not use_nodes:
+                    raise
+                # The cached nodes may have gone stale, try once more with a fresh list
+                logger.warning(
+                    f"Connecting with cached Hive nodes failed ({e}), refreshing node list"
+                )
+                invalidate_node_cache()
+                hive = _new_hive(posting_key, get_hive_nodes(ttl=node_cache_ttl))
+            logger.info("Connected to Hive blockchain.")
+        except Exception as e:
+            raise ConnectError(f"Failed to connect to Hive: {e}") from e
+
+        _HIVE_INSTANCES[digest] = hive
         return hive
-    except Exception as e:
-        logger.error(f"Failed to connect to Hive: {e}")
-        raise
+
+
+def close_hive(posting_key: Optional[str] = None, nodes: Optional[List[str]] = None) -> None:
+    """
+    Drop cached Hive connections so the next connect_to_hive call reconnects.
+
+    Args:
+        posting_key: Only drop the connection for this key. If None, drop all of them.
+        nodes: The node list the connection was made with, if any.
+    """
+    with _HIVE_LOCK:
+        if posting_key is None:
+            _HIVE_INSTANCES.clear()
+        else:
+            _HIVE_INSTANCES.pop(_key_digest(posting_key, nodes), None)
+    logger.debug("Cached Hive connection(s) closed.")
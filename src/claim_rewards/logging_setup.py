@@ -4,39 +4,75 @@ Provides consistent logging setup across all modules.
 """
 
 import logging
+import sys
 from typing import Optional
 
 from rich.logging import RichHandler
 from rich.traceback import install as install_rich_traceback
 
+# Set once the rich traceback hook has been installed
+_TRACEBACK_INSTALLED = False
+
+# Neither output format shows thread or process details, so skip
+# collecting them for every record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
 
 def setup_logging(level: Optional[int] = None) -> logging.Logger:
     """
     Configure logging for the application.
 
+    Uses Rich output when stdout is a terminal and plain timestamped lines
+    otherwise (cron, systemd, pipes), where styling would be wasted work.
+
     Args:
         level: Optional logging level to set. If None, defaults to INFO.
 
     Returns:
         The configured logger instance.
     """
+    global _TRACEBACK_INSTALLED
+
     # Get the root logger
     logger = logging.getLogger()
 
-    # Clear any existing handlers
-    for handler in logger.handlers:
-        logger.removeHandler(handler)
+    # Install rich traceback handler for enhanced tracebacks (once per process)
+    if not _TRACEBACK_INSTALLED:
+        install_rich_traceback()
+        _TRACEBACK_INSTALLED = True
+
+    # RichHandler writes to stdout, so the plain handler does too
+    interactive = sys.stdout.isatty()
+    handler_type = RichHandler if interactive else logging.StreamHandler
+
+    # Reuse an already attached handler of the wanted type and drop any other handlers
+    existing_handler = None
+    for handler in list(logger.handlers):
+        if existing_handler is None and type(handler) is handler_type:
+            existing_handler = handler
+        else:
+            logger.removeHandler(handler)
 
-    # Install rich traceback handler for enhanced tracebacks
-    install_rich_traceback()
+    if existing_handler is not None:
+        logger.setLevel(level or logging.INFO)
+        return logger
 
-    # Configure basic logging with RichHandler
-    logging.basicConfig(
-        level=level or logging.INFO,
-        format="%(message)s",
-        datefmt="[%X]",
-        handlers=[RichHandler(rich_tracebacks=True, show_time=True)],
-    )
+    if interactive:
+        # Configure basic logging with RichHandler
+        logging.basicConfig(
+            level=level or logging.INFO,
+            format="%(message)s",
+            datefmt="[%X]",
+            handlers=[RichHandler(rich_tracebacks=True, show_time=True)],
+        )
+    else:
+        logging.basicConfig(
+            level=level or logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+            handlers=[logging.StreamHandler(sys.stdout)],
+        )
 
     return logger
 
@@ -3,7 +3,7 @@
 # requires-python = ">=3.13"
 # dependencies = [
 #     "hive-nectar",
-#     "pyyaml",
+#     "pyyaml",  # PyPI wheels bundle libyaml, which provides CSafeLoader
 #     "rich",
 # ]
 #
@@ -26,16 +26,20 @@ import argparse
 import logging
 import os
 import sys
-import traceback
+from pathlib import Path
 from typing import List, Optional, Tuple
 
 import yaml
 from nectar import Hive
 from nectar.account import Account
-from nectar.nodelist import NodeList
 from rich.logging import RichHandler
 from rich.traceback import install as install_rich_traceback
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
 # Logging setup functions
 
 
@@ -69,8 +73,7 @@ def load_accounts_and_posting_key(
 ) -> Tuple[List[str], Optional[str]]:
     if accounts_path:
         try:
-            with open(accounts_path, "r") as f:
-                data = yaml.safe_load(f)
+            data = yaml.load(Path(accounts_path).read_bytes(), Loader=_SafeLoader)
             logger.info(f"Loaded accounts and posting key from {accounts_path}")
             return data.get("accounts", []), data.get("posting_key")
         except Exception as e:
@@ -78,8 +81,7 @@ def load_accounts_and_posting_key(
             sys.exit(1)
     if os.path.exists("accounts.yaml"):
         try:
-            with open("accounts.yaml", "r") as f:
-                data = yaml.safe_load(f)
+            data = yaml.load(Path("accounts.yaml").read_bytes(), Loader=_SafeLoader)
             logger.info("Loaded accounts and posting key from accounts.yaml")
             return data.get("accounts", []), data.get("posting_key")
         except Exception as e:
@@ -95,8 +97,10 @@ def get_posting_key(
     cli_posting_key: Optional[str] = None, yaml_posting_key: Optional[str] = None
 ) -> str:
     logger.debug(
-        f"Attempting to retrieve posting key (cli_posting_key provided: {bool(cli_posting_key)}, "
-        f"yaml_posting_key provided: {bool(yaml_posting_key)})"
+        "Attempting to retrieve posting key (cli_posting_key provided: %s, "
+        "yaml_posting_key provided: %s)",
+        bool(cli_posting_key),
+        bool(yaml_posting_key),
     )
     if cli_posting_key:
         logger.info("Using posting key from --posting_key argument.")
@@ -122,12 +126,9 @@ def get_posting_key(
 
 def connect_to_hive(posting_key: str) -> Hive:
     try:
-        logger.debug("Initializing NodeList and updating nodes...")
-        nodelist = NodeList()
-        nodelist.update_nodes()
-        nodes = nodelist.get_hive_nodes()
-        logger.info(f"Connecting to Hive nodes: {nodes}")
-        hive = Hive(keys=[posting_key], node=nodes)
+        logger.info("Connecting to Hive blockchain...")
+        # Let Hive handle node initialization internally to avoid duplicate beacon calls
+        hive = Hive(keys=[posting_key])
         logger.info("Connected to Hive blockchain.")
         return hive
     except Exception as e:
@@ -161,7 +162,7 @@ def claim_rewards_for_all_accounts(
         try:
             target_account = Account(account_name, blockchain_instance=hive)
             rewards = getattr(target_account, "reward_balances", [])
-            if not rewards or all(getattr(r, "amount", 0) == 0 for r in rewards):
+            if not any(r.amount for r in rewards):
                 logger.info(f"[{account_name}] No rewards to claim.")
                 continue
             logger.info(f"[{account_name}] Rewards to claim: {rewards}")
@@ -170,7 +171,8 @@ def claim_rewards_for_all_accounts(
                     f"[DRY RUN] Would claim rewards for {account_name} using authority of {main_account_name}."
                 )
                 logger.debug(
-                    f"[DRY RUN] main_account.claim_reward_balance(account={account_name}) would be called here."
+                    "[DRY RUN] main_account.claim_reward_balance(account=%s) would be called here.",
+                    account_name,
                 )
                 success_count += 1
             else:
@@ -181,13 +183,12 @@ def claim_rewards_for_all_accounts(
                 success_count += 1
         except Exception as e:
             logger.error(f"Error processing account {account_name}: {type(e).__name__}: {e}")
-            logger.debug(traceback.format_exc())
-            try:
-                logger.debug(
-                    f"{account_name} account json: {getattr(target_account, 'json', None)}"
-                )
-            except Exception:
-                logger.debug(f"Could not retrieve account JSON for {account_name}")
+            logger.debug("Traceback:", exc_info=True)
+            if logger.isEnabledFor(logging.DEBUG):
+                try:
+                    logger.debug("%s account json: %s", account_name, target_account.json())
+                except Exception:
+                    logger.debug("Could not retrieve account JSON for %s", account_name)
     logger.info(f"Successfully processed {success_count} out of {len(accounts)} accounts")
 
 
@@ -221,7 +222,7 @@ def main() -> None:
         sys.exit(1)
     posting_key = get_posting_key(args.posting_key, yaml_posting_key)
     main_account_name = accounts[0]
-    logger.debug(f"Using main authority account: {main_account_name}")
+    logger.debug("Using main authority account: %s", main_account_name)
     claim_rewards_for_all_accounts(accounts, main_account_name, posting_key, dry_run=args.dry_run)
 
 
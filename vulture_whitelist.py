@@ -0,0 +1,11 @@
+"""
+Names vulture reports as unused although they are read elsewhere.
+Passed to vulture next to src, see .pre-commit-config.yaml.
+"""
+
+import logging
+
+# Read by the logging module each time it creates a record
+logging.logThreads
+logging.logProcesses
+logging.logMultiprocessing